@@ -1,12 +1,22 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+import os
 import re
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import functools
+import joblib
+from joblib import Parallel, delayed
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.pipeline import Pipeline
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
-from nltk.tokenize import word_tokenize
+
+try:
+    from numba import njit, prange
+except ImportError: # Numba is optional; scoring falls back to SciPy's sparse dot
+    njit = None
 
 # --- Data Simulation ---
 # In a real project, this data would come from parsing PDFs/DOCX files.
@@ -50,45 +60,122 @@ MOCK_RESUMES = {
 
 # --- NLP & Data Processing ---
 
+# Resume batches larger than this are split into shards of this size and
+# processed in parallel worker processes (lemmatization in preprocess_all,
+# hashing in score_new); both steps are stateless per document.
+_SHARD_SIZE = 1000
+
+# Vocabulary trimming for the TF-IDF features:
+# terms in fewer than MIN_DF documents are mostly typos and one-off jargon, and
+# terms in more than MAX_DF of the documents are resume boilerplate. Dropping
+# both shrinks the non-zeros per row that the similarity step has to multiply.
+MIN_DF = 2
+MAX_DF = 0.95
+
+# Lowercase alphabetic runs of two or more letters; this replaces the separate
+# punctuation strip, lowercase pass and Punkt tokenization.
+_WORD_RE = re.compile(r"[a-z]{2,}")
+
+# Batch cleaning: documents are joined with a unit-separator sentinel so a single
+# regex call strips non-letters from the whole corpus. '\x1f' counts as whitespace
+# for the regex, so it survives the substitution and the result can be split back.
+_DOC_SEP = "\x1f"
+_CLEAN_RE = re.compile(r"[^a-z\s]+")
+
+@functools.lru_cache(maxsize=None)
+def _nltk_resources():
+    """
+    Loads the NLTK stop-word set and a memoized WordNet lemmatizer once per process.
+    Deferred to first use so the default (non-lemmatizing) pipeline needs no NLTK data.
+    """
+    lemmatizer = WordNetLemmatizer()
+    # Resumes repeat the same vocabulary heavily, so memoize WordNet lookups
+    return frozenset(stopwords.words('english')), functools.lru_cache(maxsize=100_000)(lemmatizer.lemmatize)
+
+if njit is not None:
+    # parallel=True starts a native (TBB/OpenMP) thread pool in this process, so
+    # never fork after this has run: process fan-out goes through joblib's loky
+    # workers (see preprocess_all / score_new), not a fork-based pool.
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _csr_dot_dense(indptr, indices, data, jd_dense, out):
+        """Dot product of every CSR row with a dense JD vector, one row per thread."""
+        for i in prange(len(out)):
+            s = 0.0
+            for k in range(indptr[i], indptr[i + 1]):
+                s += data[k] * jd_dense[indices[k]]
+            out[i] = s
+else:
+    _csr_dot_dense = None
+
+class _DocumentFrequencyFilter(BaseEstimator, TransformerMixin):
+    """
+    Keeps only the hashed term columns whose document frequency lies within
+    [min_df, max_df * n_documents]. HashingVectorizer has no vocabulary, so this
+    stands in for TfidfVectorizer's min_df/max_df options.
+    """
+    def __init__(self, min_df=1, max_df=1.0):
+        self.min_df = min_df
+        self.max_df = max_df
+
+    def fit(self, X, y=None):
+        X = sp.csr_matrix(X)
+        doc_freq = np.bincount(X.indices, minlength=X.shape[1])
+        keep = (doc_freq >= self.min_df) & (doc_freq <= self.max_df * X.shape[0])
+        if not keep.any():
+            # Tiny corpora are exempt: with the JD alone nothing reaches min_df, and with
+            # the JD plus one resume max_df * n < min_df drops every term min_df kept.
+            # Keep every term that occurs rather than leave an empty feature space.
+            keep = doc_freq > 0
+        self.columns_ = np.flatnonzero(keep)
+        return self
+
+    def transform(self, X):
+        return sp.csr_matrix(X)[:, self.columns_]
+
 class TextProcessor:
     """
     Handles cleaning and tokenizing text for machine learning features.
-    Uses NLTK for basic NLP operations.
+    Uses NLTK for basic NLP operations; the NLTK resources are shared
+    process-wide, so creating a TextProcessor is free.
     """
-    def __init__(self):
-        self.lemmatizer = WordNetLemmatizer()
-        self.stop_words = set(stopwords.words('english'))
-
     def preprocess(self, text):
         """
         Cleans text by removing punctuation, converting to lowercase,
         removing stop words, and lemmatizing the words.
         """
-        # Remove special characters and numbers
-        text = re.sub(r'[^a-zA-Z\s]', '', text)
-        text = text.lower()
-        
-        # Tokenize
-        tokens = word_tokenize(text)
-        
-        # Remove stop words and lemmatize
-        tokens = [
-            self.lemmatizer.lemmatize(word)
-            for word in tokens if word not in self.stop_words and len(word) > 1
-        ]
-        
-        return ' '.join(tokens)
+        # Tokenize: keep only alphabetic words with at least two letters
+        return self._filter_tokens(_WORD_RE.findall(text.lower()))
+
+    def preprocess_batch(self, texts):
+        """
+        Same result as preprocess() for a list of texts, but the punctuation and
+        lowercase passes run once over the joined corpus instead of per document.
+        """
+        joined = _DOC_SEP.join(text.replace(_DOC_SEP, ' ') for text in texts).lower()
+        cleaned = _CLEAN_RE.sub(' ', joined).split(_DOC_SEP)
+        return [self._filter_tokens(word for word in doc.split() if len(word) > 1) for doc in cleaned]
+
+    def _filter_tokens(self, tokens):
+        """Removes stop words and lemmatizes the remaining tokens."""
+        stop_words, lemmatize = _nltk_resources()
+        return ' '.join(lemmatize(word) for word in tokens if word not in stop_words)
 
 class RankingSystem:
     """
     The core system that processes resumes, extracts features (TF-IDF),
     and ranks them (Cosine Similarity).
     """
-    def __init__(self, job_desc, resumes_data):
-        self.processor = TextProcessor()
+    def __init__(self, job_desc, resumes_data, lemmatize=False):
+        # TfidfVectorizer handles lowercasing, tokenization and stop words itself;
+        # the NLTK processor is only needed when lemmatization is requested.
+        self.lemmatize = lemmatize
+        self.processor = TextProcessor() if lemmatize else None
         self.job_desc = job_desc
         self.resumes_data = resumes_data
         self.data_frame = None
+        # Fitted once and reused for every later batch of resumes
+        self.vectorizer = None # HashingVectorizer -> TfidfTransformer pipeline
+        self.jd_vector = None
 
     def create_dataframe(self):
         """Converts mock data into a Pandas DataFrame for structured processing."""
@@ -107,44 +194,131 @@ class RankingSystem:
         print("\n[INFO] Initial DataFrame created with", len(self.data_frame), "resumes.")
 
     def preprocess_all(self):
-        """Applies NLP preprocessing to all resume texts."""
-        # Preprocess the Job Description
-        self.processed_jd = self.processor.preprocess(self.job_desc)
-        
-        # Preprocess the Resume Texts using Pandas .apply()
-        self.data_frame['processed_text'] = self.data_frame['raw_text'].apply(self.processor.preprocess)
+        """
+        Applies NLTK lemmatization to all resume texts. Without lemmatization the
+        raw text is handed straight to the vectorizer, so this step is skipped.
+        """
+        if not self.lemmatize:
+            return
+
+        # Preprocess the Job Description and the Resume Texts in one batch
+        # (one regex pass over the whole corpus instead of one per document)
+        texts = [self.job_desc] + self.data_frame['raw_text'].tolist()
+        if len(texts) <= _SHARD_SIZE:
+            processed = self.processor.preprocess_batch(texts)
+        else:
+            # Large corpora: lemmatize shards on every core
+            shards = [texts[i:i + _SHARD_SIZE] for i in range(0, len(texts), _SHARD_SIZE)]
+            results = Parallel(n_jobs=-1, prefer='processes')(
+                delayed(self.processor.preprocess_batch)(shard) for shard in shards
+            )
+            processed = [doc for shard in results for doc in shard]
+        self.processed_jd = processed[0]
+        self.data_frame['processed_text'] = processed[1:]
         print("[INFO] Text preprocessing complete.")
 
+    def fit(self, initial_corpus):
+        """
+        Fits the TF-IDF vectorizer once on a training corpus (JD first, then resumes)
+        and caches the JD vector so later resumes only need a transform.
+        Returns the TF-IDF matrix of the corpus.
+        """
+        # TF-IDF converts text documents into a matrix of weighted token counts.
+        # This assigns higher importance to rare, job-specific terms.
+        # Lowercasing, tokenization and stop-word removal all happen inside the vectorizer.
+        # Hashing the tokens avoids building a vocabulary dict, so only the IDF
+        # weights are learned and the hashing step can be sharded across processes.
+        self.vectorizer = Pipeline([
+            ('h', HashingVectorizer(
+                n_features=2**15,
+                alternate_sign=False,
+                norm=None,
+                stop_words='english',
+                token_pattern=r"(?u)\b[a-zA-Z]{2,}\b",
+                dtype=np.float32 # Half the bytes of float64; ranking order is unaffected
+            )),
+            ('df', _DocumentFrequencyFilter(min_df=MIN_DF, max_df=MAX_DF)),
+            ('t', TfidfTransformer(sublinear_tf=True, norm='l2'))
+        ])
+        tfidf_matrix = self.vectorizer.fit_transform(initial_corpus).astype(np.float32, copy=False)
+        self.jd_vector = tfidf_matrix[0]
+        return tfidf_matrix
+
+    def score_new(self, resume_texts):
+        """
+        Scores resumes against the cached JD vector without refitting the vectorizer.
+        Expects texts in the same form the vectorizer was fitted on.
+        Large batches are transformed in parallel worker processes (joblib, as in preprocess_all).
+        """
+        if len(resume_texts) == 0:
+            return np.empty(0, dtype=np.float32)
+        if len(resume_texts) <= _SHARD_SIZE:
+            return self._similarity(self.vectorizer.transform(resume_texts))
+
+        shards = [resume_texts[i:i + _SHARD_SIZE] for i in range(0, len(resume_texts), _SHARD_SIZE)]
+        results = Parallel(n_jobs=-1, prefer='processes')(
+            delayed(self.vectorizer.transform)(shard) for shard in shards
+        )
+        resume_vectors = sp.vstack(results)
+        return self._similarity(resume_vectors.tocsr())
+
+    def _similarity(self, resume_vectors):
+        """Cosine similarity of each resume vector to the cached JD vector."""
+        # TfidfTransformer already L2-normalizes every row (norm='l2'),
+        # so the cosine reduces to a plain sparse dot product.
+        resume_vectors = resume_vectors.astype(np.float32, copy=False)
+        if _csr_dot_dense is None:
+            return (resume_vectors @ self.jd_vector.T).toarray().ravel()
+
+        # One JD against N resumes: a tight compiled loop over the CSR arrays
+        # beats SciPy's sparse-matmul dispatch at these sizes.
+        resume_vectors = resume_vectors.tocsr()
+        jd_dense = self.jd_vector.toarray().ravel()
+        similarity_scores = np.empty(resume_vectors.shape[0], dtype=np.float32)
+        _csr_dot_dense(resume_vectors.indptr, resume_vectors.indices, resume_vectors.data, jd_dense, similarity_scores)
+        return similarity_scores
+
+    def save_vectorizer(self, path):
+        """Persists the fitted vectorizer and JD vector with joblib."""
+        joblib.dump({'vectorizer': self.vectorizer, 'jd_vector': self.jd_vector}, path)
+
+    def load_vectorizer(self, path):
+        """Restores a vectorizer and JD vector saved by save_vectorizer()."""
+        state = joblib.load(path)
+        self.vectorizer = state['vectorizer']
+        self.jd_vector = state['jd_vector']
+
     def feature_extraction_and_ranking(self):
         """
         Uses TF-IDF for feature extraction and Cosine Similarity for ranking.
+        The vectorizer is fitted on the first call only; later calls just transform.
         """
-        # Prepare the corpus: JD first, followed by all resumes
-        corpus = [self.processed_jd] + self.data_frame['processed_text'].tolist()
-        
+        if self.lemmatize:
+            resume_texts = self.data_frame['processed_text'].tolist()
+        else:
+            resume_texts = self.data_frame['raw_text'].tolist()
+
         # 1. Feature Extraction (Vectorization)
-        # TF-IDF converts text documents into a matrix of weighted token counts.
-        # This assigns higher importance to rare, job-specific terms.
-        vectorizer = TfidfVectorizer(max_features=1000) # Limit features for efficiency
-        tfidf_matrix = vectorizer.fit_transform(corpus)
-        
-        # Separate JD vector from Resume vectors
-        jd_vector = tfidf_matrix[0]
-        resume_vectors = tfidf_matrix[1:]
+        if self.vectorizer is None:
+            # Prepare the corpus: JD first, followed by all resumes
+            jd_text = self.processed_jd if self.lemmatize else self.job_desc
+            resume_vectors = self.fit([jd_text] + resume_texts)[1:]
+        else:
+            resume_vectors = self.vectorizer.transform(resume_texts)
         
         print("[INFO] TF-IDF feature extraction complete.")
 
         # 2. Ranking (Similarity Calculation)
         # Cosine similarity measures the angle between two vectors (documents).
         # A score close to 1 indicates high similarity/relevance.
-        similarity_scores = cosine_similarity(jd_vector, resume_vectors).flatten()
-        
-        # Add the scores to the DataFrame
-        self.data_frame['relevance_score'] = similarity_scores
+        similarity_scores = self._similarity(resume_vectors)
         
         # 3. Final Ranking
-        self.data_frame = self.data_frame.sort_values(by='relevance_score', ascending=False).reset_index(drop=True)
-        self.data_frame['rank'] = self.data_frame.index + 1
+        # A single integer permutation reorders every column at once
+        order = np.argsort(-similarity_scores, kind='stable')
+        self.data_frame = self.data_frame.iloc[order].reset_index(drop=True)
+        self.data_frame['relevance_score'] = similarity_scores[order]
+        self.data_frame['rank'] = np.arange(1, len(order) + 1)
         
         print("[INFO] Ranking complete based on Cosine Similarity.")
 
@@ -157,19 +331,29 @@ class RankingSystem:
 
 # --- Visualization ---
 
-def visualize_ranking(df):
+# Set HEADLESS=1 for batch runs: plotting is skipped and the style is never loaded.
+HEADLESS = os.environ.get('HEADLESS') == '1'
+if not HEADLESS:
+    # Applied once at import rather than on every visualize_ranking() call
+    plt.style.use('seaborn-v0_8-darkgrid')
+
+def visualize_ranking(df, show=True, fig=None):
     """
     Uses Matplotlib to visualize the final ranking results.
+    Pass an existing 'fig' to redraw into it instead of creating a new figure,
+    and show=False to skip plt.show(). Returns the figure.
     """
-    plt.style.use('seaborn-v0_8-darkgrid')
-    
     # Sort by score for visualization
     df_sorted = df.sort_values(by='relevance_score', ascending=True)
 
     names = df_sorted['name']
     scores = df_sorted['relevance_score']
     
-    fig, ax = plt.subplots(figsize=(10, 6))
+    if fig is None:
+        fig, ax = plt.subplots(figsize=(10, 6))
+    else:
+        fig.clear()
+        ax = fig.add_subplot()
     bars = ax.barh(names, scores, color=['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728']) # Distinct colors
     
     ax.set_xlabel("Relevance Score (0.0 to 1.0)", fontsize=12)
@@ -177,6 +361,8 @@ def visualize_ranking(df):
     
     # Get the list of names in the order they were plotted (from df_sorted)
     plotted_names = df_sorted['name'].tolist() 
+    # Map each name to its rank once, instead of scanning 'df' for every bar
+    name_to_rank = dict(zip(df['name'], df['rank']))
     
     # Add labels to the bars
     for i, bar in enumerate(bars):
@@ -184,14 +370,16 @@ def visualize_ranking(df):
         # Use the index 'i' to get the name from the plotted_names list
         candidate_name = plotted_names[i] 
         # Look up the rank in the original (unsorted) DataFrame 'df'
-        rank = df[df["name"] == candidate_name]["rank"].iloc[0] 
+        rank = name_to_rank[candidate_name]
         
         ax.text(width + 0.01, bar.get_y() + bar.get_height()/2, 
                 f'{width:.4f} (Rank {rank})',
                 va='center', fontsize=10)
 
-    plt.tight_layout()
-    plt.show() # 
+    fig.tight_layout()
+    if show:
+        plt.show() # 
+    return fig
 
 # --- Main Execution ---
 
@@ -210,7 +398,8 @@ if __name__ == "__main__":
     print("="*80)
 
     # 3. Visualization
-    visualize_ranking(final_ranking_df)
+    if not HEADLESS:
+        visualize_ranking(final_ranking_df)
     
     # 4. Analysis and Insights (The 'Improved Ranking Accuracy' part)
     print("\n--- Project Analysis and Improvement Insights ---")
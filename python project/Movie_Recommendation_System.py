@@ -1,11 +1,15 @@
+import os
+import functools
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import LabelBinarizer
+import scipy.sparse as sp
 
-# Setting consistent visualization style
-plt.style.use('ggplot')
+# Set HEADLESS=1 for batch runs: plotting is skipped and the style is never loaded.
+HEADLESS = os.environ.get('HEADLESS') == '1'
+if not HEADLESS:
+    # Setting consistent visualization style
+    plt.style.use('ggplot')
 
 class MovieRecommender:
     """
@@ -15,7 +19,14 @@ class MovieRecommender:
     def __init__(self):
         self._simulate_data()
         self.movie_similarity_matrix = None
+        self.movie_similarity_df = None
         self.user_similarity_matrix = None
+        self.user_similarity_df = None
+        self.user_movie_matrix = None
+        # Per-instance memo tables for repeated recommendation queries;
+        # cleared whenever the underlying similarity data is rebuilt.
+        self._cbf_top_ids = functools.lru_cache(maxsize=1024)(self._compute_cbf_top_ids)
+        self._cf_candidates = functools.lru_cache(maxsize=1024)(self._compute_cf_candidates)
         
     def _simulate_data(self):
         """
@@ -33,6 +44,19 @@ class MovieRecommender:
         })
         self.metadata_df = self.metadata_df.set_index('MovieID')
 
+        # --- Genre Features (For Content-Based Filtering) ---
+        # One-hot genre matrix and per-movie L2 norms, computed once here and
+        # reused by every similarity calculation.
+        # Filled straight into a pre-sized contiguous float32 array (no get_dummies DataFrame).
+        genres_list = [set(g.split('|')) for g in self.metadata_df['Genres']]
+        self.genre_names = sorted({g for movie_genres in genres_list for g in movie_genres})
+        genre_to_idx = {g: i for i, g in enumerate(self.genre_names)}
+        self.genre_matrix = np.zeros((len(genres_list), len(self.genre_names)), dtype=np.float32)
+        for i, movie_genres in enumerate(genres_list):
+            for g in movie_genres:
+                self.genre_matrix[i, genre_to_idx[g]] = 1.0
+        self.genre_norm = np.linalg.norm(self.genre_matrix, axis=1)
+
         # --- Simulated User Ratings (For Collaborative Filtering) ---
         # Data designed to show two distinct user clusters:
         # User 1 & 2 like Action/Sci-Fi. User 3 & 4 like Comedy/Romance.
@@ -45,16 +69,31 @@ class MovieRecommender:
         
         print(f"[INFO] Data Simulation Complete: {len(self.metadata_df)} movies, {len(self.ratings_df['UserID'].unique())} users.")
 
-    def analyze_ratings(self):
-        """Analyzes and visualizes rating distribution."""
-        plt.figure(figsize=(8, 5))
-        self.ratings_df['Rating'].hist(bins=5, color='teal', alpha=0.7, edgecolor='black')
-        plt.title('Distribution of Simulated User Ratings', fontsize=14)
-        plt.xlabel('Rating', fontsize=12)
-        plt.ylabel('Count of Ratings', fontsize=12)
-        plt.xticks([1, 2, 3, 4, 5])
-        plt.show() # 
+    def analyze_ratings(self, show=True, fig=None):
+        """
+        Analyzes and visualizes rating distribution.
+        Pass an existing 'fig' to redraw into it, and show=False to skip plt.show().
+        """
+        if fig is None:
+            fig, ax = plt.subplots(figsize=(8, 5))
+        else:
+            fig.clear()
+            ax = fig.add_subplot()
+        self.ratings_df['Rating'].hist(ax=ax, bins=5, color='teal', alpha=0.7, edgecolor='black')
+        ax.set_title('Distribution of Simulated User Ratings', fontsize=14)
+        ax.set_xlabel('Rating', fontsize=12)
+        ax.set_ylabel('Count of Ratings', fontsize=12)
+        ax.set_xticks([1, 2, 3, 4, 5])
+        if show:
+            plt.show() # 
         print("\n[ANALYTICS] Rating distribution analysis complete.")
+        return fig
+
+    @staticmethod
+    def _cosine_from_gram(gram, norms):
+        """Turns a Gram matrix (A @ A.T) into cosine similarities using precomputed row norms."""
+        denom = np.outer(norms, norms)
+        return np.divide(gram, denom, out=np.zeros_like(gram), where=denom > 0)
 
     # --- 1. Content-Based Filtering (CBF) ---
     def calculate_cbf_similarity(self):
@@ -62,13 +101,14 @@ class MovieRecommender:
         Uses One-Hot Encoding on genres and Cosine Similarity to find
         movie-to-movie relevance based on metadata.
         """
-        # 1. Feature Extraction (Genres)
-        genres = self.metadata_df['Genres'].str.get_dummies(sep='|')
-        print(f"[CBF] Extracted {len(genres.columns)} genres for analysis.")
+        # 1. Feature Extraction (Genres), precomputed in _simulate_data
+        print(f"[CBF] Extracted {len(self.genre_names)} genres for analysis.")
 
         # 2. Calculate Cosine Similarity Matrix
         # This matrix tells us how similar any movie is to any other movie based on their genres.
-        self.movie_similarity_matrix = cosine_similarity(genres)
+        # Dividing the float32 Gram matrix by the precomputed norms gives the cosines.
+        A = self.genre_matrix
+        self.movie_similarity_matrix = self._cosine_from_gram(A @ A.T, self.genre_norm)
         
         # Convert to DataFrame for easy indexing
         self.movie_similarity_df = pd.DataFrame(
@@ -76,6 +116,7 @@ class MovieRecommender:
             index=self.metadata_df.index, 
             columns=self.metadata_df.index
         )
+        self._cbf_top_ids.cache_clear()
         print("[CBF] Movie-to-Movie Similarity Matrix calculated.")
 
     def get_cbf_recommendations(self, target_movie_id, top_n=3):
@@ -85,67 +126,97 @@ class MovieRecommender:
         
         movie_title = self.metadata_df.loc[target_movie_id, 'Title']
         
-        # Get similarity scores for the target movie
-        sim_scores = self.movie_similarity_df.loc[target_movie_id].sort_values(ascending=False)
-        
-        # Exclude the movie itself and get the top N
-        top_indices = sim_scores.iloc[1:top_n+1].index
+        # Repeated (movie, top_n) queries skip the sort entirely
+        top_indices = list(self._cbf_top_ids(target_movie_id, top_n))
         
         recommendations = self.metadata_df.loc[top_indices]
         print(f"\n--- Content-Based Recommendations for '{movie_title}' ---")
         return recommendations[['Title', 'Genres']]
 
+    def _compute_cbf_top_ids(self, target_movie_id, top_n):
+        """Returns the IDs of the top_n movies most similar to the target, as a tuple."""
+        # Get similarity scores for the target movie
+        sim_scores = self.movie_similarity_df.loc[target_movie_id].sort_values(ascending=False)
+        
+        # Exclude the movie itself and get the top N
+        return tuple(sim_scores.iloc[1:top_n+1].index)
+
 
     # --- 2. Collaborative Filtering (CF) ---
-    def calculate_cf_similarity(self):
+    def build_user_movie_matrix(self):
         """
-        Creates the User-Item Utility Matrix and calculates User-to-User similarity.
+        Creates the User-Item Utility Matrix. It is kept sparse (CSR), so memory
+        scales with the number of ratings rather than users x movies.
         """
-        # 1. Create User-Item Matrix (Pivot Table)
-        self.user_movie_matrix = self.ratings_df.pivot(
-            index='UserID', 
-            columns='MovieID', 
-            values='Rating'
-        ).fillna(0)
+        # Create User-Item Matrix (Sparse CSR)
+        # Map raw IDs to contiguous row/column positions
+        self.idx_to_user = np.sort(self.ratings_df['UserID'].unique())
+        self.idx_to_movie = np.sort(self.ratings_df['MovieID'].unique())
+        self.user_to_idx = {user_id: i for i, user_id in enumerate(self.idx_to_user)}
+        self.movie_to_idx = {movie_id: i for i, movie_id in enumerate(self.idx_to_movie)}
+
+        row = self.ratings_df['UserID'].map(self.user_to_idx).to_numpy()
+        col = self.ratings_df['MovieID'].map(self.movie_to_idx).to_numpy()
+        self.user_movie_matrix = sp.csr_matrix(
+            (self.ratings_df['Rating'].to_numpy(dtype=np.float32), (row, col)),
+            shape=(len(self.idx_to_user), len(self.idx_to_movie))
+        )
+        # Inverted index (movie -> users who rated it) and per-user L2 norms,
+        # used to score one user against all others without the all-pairs product
+        self.user_movie_csc = self.user_movie_matrix.tocsc()
+        self.user_norms = np.sqrt(self.user_movie_matrix.multiply(self.user_movie_matrix).sum(axis=1)).A1
+        self._cf_candidates.cache_clear()
         print("[CF] User-Item Matrix created.")
+
+    def calculate_cf_similarity(self):
+        """
+        Creates the User-Item Utility Matrix and calculates the full User-to-User
+        similarity matrix (for analysis; recommendations only need one row of it).
+        """
+        # 1. Create User-Item Matrix
+        self.build_user_movie_matrix()
         
         # 2. Calculate User-to-User Cosine Similarity
         # This matrix tells us how similar any user is to any other user based on their ratings.
-        self.user_similarity_matrix = cosine_similarity(self.user_movie_matrix)
+        # The per-user norms from build_user_movie_matrix are reused, not recomputed.
+        M = self.user_movie_matrix
+        self.user_similarity_matrix = self._cosine_from_gram((M @ M.T).toarray(), self.user_norms)
         
-        # Convert to DataFrame for easier lookup
+        # Convert to DataFrame for easier lookup (display only)
         self.user_similarity_df = pd.DataFrame(
             self.user_similarity_matrix, 
-            index=self.user_movie_matrix.index, 
-            columns=self.user_movie_matrix.index
+            index=self.idx_to_user, 
+            columns=self.idx_to_user
         )
         print("[CF] User-to-User Similarity Matrix calculated.")
 
-    def get_cf_recommendations(self, target_user_id, top_n=3):
+    def _user_similarity_scores(self, target_idx):
         """
-        Recommends movies based on ratings of similar users (neighbors).
+        Cosine similarity of one user to every user, via the movie -> users inverted index.
+        Only users sharing at least one rated movie with the target are ever touched.
         """
-        if self.user_similarity_df is None:
-            self.calculate_cf_similarity()
-        
-        # 1. Find Nearest Neighbors
-        # Get similarity scores for the target user
-        user_sim_scores = self.user_similarity_df.loc[target_user_id].sort_values(ascending=False)
+        user_row = self.user_movie_matrix[target_idx]
+        csc = self.user_movie_csc
         
-        # Exclude the user itself and get top neighbors
-        top_neighbor_ids = user_sim_scores.iloc[1:2].index # Using just the top 1 neighbor for simplicity
+        # Accumulate the dot products one co-rated movie at a time
+        scores = np.zeros(self.user_movie_matrix.shape[0], dtype=np.float32)
+        for movie_idx, rating in zip(user_row.indices, user_row.data):
+            start, end = csc.indptr[movie_idx], csc.indptr[movie_idx + 1]
+            scores[csc.indices[start:end]] += csc.data[start:end] * rating
         
-        # 2. Identify Potential Recommendations
-        # Movies the target user has NOT rated (rating is 0 in the matrix)
-        unrated_movies = self.user_movie_matrix.loc[target_user_id][self.user_movie_matrix.loc[target_user_id] == 0].index
+        # Divide by the precomputed norms to turn dot products into cosines
+        denom = self.user_norms * self.user_norms[target_idx]
+        return np.divide(scores, denom, out=np.zeros_like(scores), where=denom > 0)
+
+    def get_cf_recommendations(self, target_user_id, top_n=3):
+        """
+        Recommends movies based on ratings of similar users (neighbors).
+        """
+        if self.user_movie_matrix is None:
+            self.build_user_movie_matrix()
         
-        recommendations = {}
-        for neighbor_id in top_neighbor_ids:
-            # Find the neighbor's high ratings for unrated movies
-            neighbor_ratings = self.user_movie_matrix.loc[neighbor_id][unrated_movies]
-            # Recommend movies the neighbor rated 4 or 5
-            for movie_id, rating in neighbor_ratings[neighbor_ratings >= 4].items():
-                recommendations[movie_id] = rating
+        # Repeated queries for the same user reuse the cached candidates
+        recommendations = dict(self._cf_candidates(target_user_id))
 
         # Convert to final DataFrame for display
         recommended_movie_ids = list(recommendations.keys())
@@ -159,6 +230,31 @@ class MovieRecommender:
         print(f"\n--- Collaborative Filtering Recommendations for User {target_user_id} ---")
         return final_recs[['Title', 'Genres', 'Predicted Rating']].head(top_n)
 
+    def _compute_cf_candidates(self, target_user_id):
+        """Returns (MovieID, neighbor rating) pairs recommended for the target user, as a tuple."""
+        # 1. Find Nearest Neighbors
+        # Get similarity scores for the target user
+        target_idx = self.user_to_idx[target_user_id]
+        user_sim_scores = self._user_similarity_scores(target_idx)
+        user_sim_scores[target_idx] = -np.inf # Exclude the user itself
+        
+        # Get top neighbors
+        top_neighbor_idx = np.argsort(-user_sim_scores, kind='stable')[:1] # Using just the top 1 neighbor for simplicity
+        top_neighbor_ids = self.idx_to_user[top_neighbor_idx]
+        
+        # 2. Identify Potential Recommendations
+        # Movies the target user has rated are the stored column indices of their CSR row
+        user_row = self.user_movie_matrix[target_idx]
+        
+        recommendations = {}
+        for neighbor_id in top_neighbor_ids:
+            neighbor_row = self.user_movie_matrix[self.user_to_idx[neighbor_id]]
+            # Recommend movies the neighbor rated 4 or 5 that the target user has not rated
+            mask = (neighbor_row.data >= 4) & ~np.isin(neighbor_row.indices, user_row.indices)
+            for col, rating in zip(neighbor_row.indices[mask], neighbor_row.data[mask]):
+                recommendations[int(self.idx_to_movie[col])] = float(rating)
+        return tuple(recommendations.items())
+
 # --- Main Execution ---
 
 if __name__ == "__main__":
@@ -166,7 +262,8 @@ if __name__ == "__main__":
     recommender = MovieRecommender()
     
     # --- Data Analytics and Visualization ---
-    recommender.analyze_ratings()
+    if not HEADLESS:
+        recommender.analyze_ratings()
     
     # --- 1. Content-Based Filtering Demo ---
     # Find movies similar to 'The Sci-Fi Epic' (Movie ID 101)
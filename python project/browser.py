@@ -1,41 +1,118 @@
+import os
+import re
 import sys
+import time
+import functools
+import urllib.parse
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLineEdit, QPushButton, QTabWidget, QToolBar, QSizePolicy
 )
 from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtCore import QUrl, Qt, pyqtSignal, QSize
+from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineProfile
+from PyQt6.QtCore import QUrl, Qt, pyqtSignal, pyqtSlot, QSize, QTimer
 from PyQt6.QtGui import QIcon, QAction
 
+# --- Shared Styles and Icons ---
+# Built once per process and shared by every window.
+
+# Flat white background with a subtle border for a modern look
+_TOOLBAR_QSS = "QToolBar { background: #ffffff; border-bottom: 1px solid #eee; padding: 5px; }"
+
+# Qt style sheets do not support 'box-shadow', so it is left out here rather than
+# having Qt's CSS parser warn about it for every window.
+_URLBAR_QSS = """
+    QLineEdit {
+        border: 1px solid #dfe1e5;
+        border-radius: 20px; /* Slightly less rounded */
+        padding: 5px 15px;
+        background-color: #f1f3f4; /* Light gray background */
+        font-size: 14px;
+        min-height: 36px;
+        color: #202124;
+    }
+    QLineEdit:focus {
+        border: 1px solid #dadce0;
+        background-color: white; /* White on focus */
+    }
+"""
+
+# Omnibox input without a scheme that should be opened as an address:
+# a single whitespace-free token containing a dot (e.g. 'example.com/path')
+_URL_RE = re.compile(r'^[^\s]+\.[^\s]+$')
+
+@functools.lru_cache(maxsize=None)
+def _themed_icon(name):
+    """QIcon.fromTheme walks the icon theme directories on disk, so look each name up only once."""
+    return QIcon.fromTheme(name)
+
+# On-disk profile settings: revisited pages are served from the HTTP cache
+PROFILE_NAME = "PyChrome"
+PROFILE_CACHE_PATH = os.path.expanduser("~/.cache/pychrome")
+PROFILE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+@functools.lru_cache(maxsize=None)
+def _shared_profile():
+    """
+    The named (persistent) profile every tab uses, so they share one network stack,
+    HTTP disk cache and cookie jar. Created once per process: two profiles may not
+    use the same storage path.
+    """
+    profile = QWebEngineProfile(PROFILE_NAME, QApplication.instance())
+    profile.setCachePath(PROFILE_CACHE_PATH)
+    profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.DiskHttpCache)
+    profile.setHttpCacheMaximumSize(PROFILE_CACHE_MAX_BYTES)
+    profile.setPersistentCookiesPolicy(QWebEngineProfile.PersistentCookiesPolicy.ForcePersistentCookies)
+    return profile
+
 # --- Helper Class for the Web View (The Tab Content) ---
 class BrowserTab(QWebEngineView):
     """Represents a single tab/web page view."""
     # Signal to update the main window's URL bar when navigation happens inside the tab
     url_changed_in_tab = pyqtSignal(QUrl)
 
-    def __init__(self):
+    def __init__(self, profile=None):
         super().__init__()
-        # Connect the internal signal for URL change to our custom signal
-        self.urlChanged.connect(self.handle_url_change)
+        if profile is not None:
+            # Load pages through the given (shared) profile instead of the default one
+            self.setPage(QWebEnginePage(profile, self))
+        # Connect the internal signal for URL change to our custom signal.
+        # Everything runs on the GUI thread, so skip AutoConnection's thread check.
+        self.urlChanged.connect(self.handle_url_change, Qt.ConnectionType.DirectConnection)
         # Set a title to display in the tab bar
         self.setWindowTitle("New Tab")
 
+    @pyqtSlot(QUrl)
     def handle_url_change(self, url):
         """Emits the URL to the parent window."""
         self.url_changed_in_tab.emit(url)
 
+    def restore_scroll_position(self, pos):
+        """Scrolls to 'pos' once the next page load finishes (used when waking a suspended tab)."""
+        def scroll(_ok):
+            self.loadFinished.disconnect(scroll)
+            self.page().runJavaScript(f"window.scrollTo({pos.x()}, {pos.y()});")
+        self.loadFinished.connect(scroll)
+
 # --- Main Browser Window ---
 class BrowserWindow(QMainWindow):
     # Configuration for default search and home page
     DEFAULT_HOME_URL = QUrl("https://bing.com/")
     # Placeholder {0} will be replaced by the search query
     SEARCH_URL_TEMPLATE = "https://bing.com/?q={0}"
+    # Background tabs idle for longer than this are suspended (web view destroyed)
+    SUSPEND_AFTER_SECS = 10 * 60
+    SUSPEND_CHECK_INTERVAL_MS = 30 * 1000
+    URL_BAR_UPDATE_MS = 50
 
     def __init__(self):
         super().__init__()
         self.setWindowTitle("PyChrome - Python Browser")
         self.setMinimumSize(800, 600)
 
+        # Shared by every tab: disk HTTP cache and persistent cookies
+        self._profile = _shared_profile()
+
         # Main Tab Widget
         self.tabs = QTabWidget()
         self.tabs.setDocumentMode(True)
@@ -43,34 +120,57 @@ class BrowserWindow(QMainWindow):
         self.tabs.tabCloseRequested.connect(self.close_tab)
         self.tabs.currentChanged.connect(self.current_tab_changed)
 
+        # Lazily created tabs: placeholder widget id -> URL to load once the tab is first focused
+        self._pending: dict[int, QUrl] = {}
+        # Suspended tabs: placeholder widget id -> scroll position to restore on wake-up
+        self._frozen_scroll = {}
+        # Live tabs: BrowserTab -> time.monotonic() when it was last focused
+        self._last_focus = {}
+        self._focused_tab = None
+        # Live tabs: BrowserTab -> last title applied by setTabText
+        self._last_title = {}
+
+        # Periodically suspend tabs that have been in the background for too long
+        self._suspend_timer = QTimer(self)
+        self._suspend_timer.setInterval(self.SUSPEND_CHECK_INTERVAL_MS)
+        self._suspend_timer.timeout.connect(self.suspend_idle_tabs)
+        self._suspend_timer.start()
+
+        # Address bar updates are coalesced: bursts of urlChanged (redirects, pushState)
+        # repaint the bar at most once per URL_BAR_UPDATE_MS, showing the latest URL
+        self._pending_url = None
+        self._url_timer = QTimer(self)
+        self._url_timer.setSingleShot(True)
+        self._url_timer.setInterval(self.URL_BAR_UPDATE_MS)
+        self._url_timer.timeout.connect(self._flush_url_bar)
+
         self.setCentralWidget(self.tabs)
 
         # Create Navigation Toolbar (Sleek and flat design)
         nav_toolbar = QToolBar("Navigation")
         nav_toolbar.setIconSize(QSize(20, 20))
-        # Flat white background with a subtle border for a modern look
-        nav_toolbar.setStyleSheet("QToolBar { background: #ffffff; border-bottom: 1px solid #eee; padding: 5px; }")
+        nav_toolbar.setStyleSheet(_TOOLBAR_QSS)
         self.addToolBar(Qt.ToolBarArea.TopToolBarArea, nav_toolbar)
 
         # --- Navigation Buttons ---
 
         # Back Button
-        back_btn = QAction(QIcon.fromTheme("go-previous"), "Back", self)
-        back_btn.triggered.connect(lambda: self.tabs.currentWidget().back())
+        back_btn = QAction(_themed_icon("go-previous"), "Back", self)
+        back_btn.triggered.connect(self._nav_back)
         nav_toolbar.addAction(back_btn)
 
         # Forward Button
-        forward_btn = QAction(QIcon.fromTheme("go-next"), "Forward", self)
-        forward_btn.triggered.connect(lambda: self.tabs.currentWidget().forward())
+        forward_btn = QAction(_themed_icon("go-next"), "Forward", self)
+        forward_btn.triggered.connect(self._nav_forward)
         nav_toolbar.addAction(forward_btn)
 
         # Reload Button
-        reload_btn = QAction(QIcon.fromTheme("view-refresh"), "Reload", self)
-        reload_btn.triggered.connect(lambda: self.tabs.currentWidget().reload())
+        reload_btn = QAction(_themed_icon("view-refresh"), "Reload", self)
+        reload_btn.triggered.connect(self._nav_reload)
         nav_toolbar.addAction(reload_btn)
 
         # Home Button (Now defaults to DuckDuckGo)
-        home_btn = QAction(QIcon.fromTheme("go-home"), "Home", self)
+        home_btn = QAction(_themed_icon("go-home"), "Home", self)
         home_btn.triggered.connect(self.navigate_home)
         nav_toolbar.addAction(home_btn)
 
@@ -78,22 +178,7 @@ class BrowserWindow(QMainWindow):
         self.url_bar = QLineEdit()
         self.url_bar.returnPressed.connect(self.navigate_to_url)
         self.url_bar.setPlaceholderText("Enter URL or search term here...")
-        self.url_bar.setStyleSheet("""
-            QLineEdit {
-                border: 1px solid #dfe1e5;
-                border-radius: 20px; /* Slightly less rounded */
-                padding: 5px 15px;
-                background-color: #f1f3f4; /* Light gray background */
-                font-size: 14px;
-                min-height: 36px;
-                color: #202124;
-            }
-            QLineEdit:focus {
-                border: 1px solid #dadce0;
-                background-color: white; /* White on focus */
-                box-shadow: none; /* Reset shadow */
-            }
-        """)
+        self.url_bar.setStyleSheet(_URLBAR_QSS)
         
         # Address bar takes up most space
         self.url_bar.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
@@ -101,30 +186,121 @@ class BrowserWindow(QMainWindow):
 
         # --- Add Tab Button ---
         # Changed to a standard action button for cleaner integration
-        add_tab_action = QAction(QIcon.fromTheme("list-add"), "New Tab", self)
-        add_tab_action.triggered.connect(self.add_new_tab)
+        add_tab_action = QAction(_themed_icon("list-add"), "New Tab", self)
+        add_tab_action.triggered.connect(self._new_tab)
         nav_toolbar.addAction(add_tab_action)
 
         # Start with a home tab using the new default URL
         self.add_new_tab(self.DEFAULT_HOME_URL, "Home")
 
-    def add_new_tab(self, qurl=None, label="New Tab"):
-        """Adds a new tab with the specified URL."""
+    def add_new_tab(self, qurl=None, label="New Tab", background=False):
+        """
+        Adds a new tab with the specified URL.
+        The tab starts as a lightweight placeholder; the web view (and its renderer
+        process) is only created when the tab is first focused. Pass background=True
+        (e.g. when restoring several tabs) to add it without focusing it.
+        """
         if qurl is None:
             # Default to the configured home page
             qurl = self.DEFAULT_HOME_URL
 
-        browser = BrowserTab()
-        browser.setUrl(qurl)
+        placeholder = QWidget()
+        self._pending[id(placeholder)] = qurl
+
+        i = self.tabs.addTab(placeholder, label)
+        if not background:
+            self.tabs.setCurrentIndex(i)
+
+    def _swap_tab_widget(self, index, widget):
+        """Replaces the widget at 'index', keeping its label and icon, without re-triggering current_tab_changed."""
+        current = self.tabs.currentIndex()
+        self.tabs.blockSignals(True)
+        self.tabs.insertTab(index, widget, self.tabs.tabIcon(index), self.tabs.tabText(index))
+        self.tabs.removeTab(index + 1)
+        self.tabs.setCurrentIndex(current)
+        self.tabs.blockSignals(False)
+
+    def materialize_tab(self, index):
+        """Replaces the placeholder at 'index' with a real BrowserTab and starts loading its URL."""
+        placeholder = self.tabs.widget(index)
+
+        browser = BrowserTab(self._profile)
+
+        # Connect signals for the new tab (decorated slots; the tab is found via sender()).
+        # Tabs live on the GUI thread, so direct connections avoid the per-emission thread check.
+        browser.titleChanged.connect(self._on_title_changed, Qt.ConnectionType.DirectConnection)
+        browser.url_changed_in_tab.connect(self.update_url_bar, Qt.ConnectionType.DirectConnection)
+        browser.iconChanged.connect(self._on_icon_changed, Qt.ConnectionType.DirectConnection)
 
-        i = self.tabs.addTab(browser, label)
-        self.tabs.setCurrentIndex(i)
+        self._swap_tab_widget(index, browser)
 
-        # Connect signals for the new tab
-        browser.titleChanged.connect(lambda title, index=i: self.setTabText(title, index))
-        browser.url_changed_in_tab.connect(self.update_url_bar)
-        browser.loadFinished.connect(lambda _, b=browser: self.tabs.setTabIcon(self.tabs.indexOf(b), b.icon()))
+        # A suspended tab picks up where it was left
+        scroll = self._frozen_scroll.pop(id(placeholder), None)
+        if scroll is not None:
+            browser.restore_scroll_position(scroll)
+        browser.setUrl(self._pending.pop(id(placeholder)))
+        placeholder.deleteLater()
+        return browser
 
+    def suspend_tab(self, index):
+        """
+        Destroys the web view at 'index' to free its renderer, leaving a placeholder
+        that remembers the URL and scroll position until the tab is focused again.
+        """
+        browser = self.tabs.widget(index)
+        browser.page().triggerAction(QWebEnginePage.WebAction.Stop)
+
+        placeholder = QWidget()
+        self._pending[id(placeholder)] = browser.url()
+        self._frozen_scroll[id(placeholder)] = browser.page().scrollPosition()
+        self._swap_tab_widget(index, placeholder)
+
+        self._last_focus.pop(browser, None)
+        self._last_title.pop(browser, None)
+        browser.deleteLater()
+
+    @pyqtSlot()
+    def suspend_idle_tabs(self):
+        """Suspends every background tab that has not been focused for SUSPEND_AFTER_SECS."""
+        cutoff = time.monotonic() - self.SUSPEND_AFTER_SECS
+        for index in range(self.tabs.count()):
+            browser = self.tabs.widget(index)
+            if browser is self._focused_tab or not isinstance(browser, BrowserTab):
+                continue
+            if self._last_focus.get(browser, cutoff) <= cutoff:
+                self.suspend_tab(index)
+
+    @pyqtSlot(str)
+    def _on_title_changed(self, title):
+        """Updates the tab text of whichever tab emitted titleChanged."""
+        self.setTabText(title, self.tabs.indexOf(self.sender()))
+
+    @pyqtSlot(QIcon)
+    def _on_icon_changed(self, icon):
+        """
+        Sets the favicon of whichever tab emitted iconChanged. This fires once per
+        favicon change rather than on every load, so the indexOf scan is rare.
+        """
+        self.tabs.setTabIcon(self.tabs.indexOf(self.sender()), icon)
+
+    @pyqtSlot()
+    def _new_tab(self):
+        """Opens a home page tab from the toolbar."""
+        self.add_new_tab()
+
+    @pyqtSlot()
+    def _nav_back(self):
+        self.tabs.currentWidget().back()
+
+    @pyqtSlot()
+    def _nav_forward(self):
+        self.tabs.currentWidget().forward()
+
+    @pyqtSlot()
+    def _nav_reload(self):
+        self.tabs.currentWidget().reload()
+
+    @pyqtSlot(int)
     def close_tab(self, index):
         """Closes the tab at the given index."""
         if self.tabs.count() < 2:
@@ -132,55 +308,97 @@ class BrowserWindow(QMainWindow):
             self.tabs.currentWidget().setUrl(self.DEFAULT_HOME_URL)
             return
 
+        # Forget any state kept for the tab and release its web view
+        widget = self.tabs.widget(index)
+        self._pending.pop(id(widget), None)
+        self._frozen_scroll.pop(id(widget), None)
+        self._last_focus.pop(widget, None)
+        self._last_title.pop(widget, None)
         self.tabs.removeTab(index)
+        widget.deleteLater()
 
+    @pyqtSlot()
     def navigate_to_url(self):
         """Handles navigation from the Omnibox, performing a search using the configured engine if needed."""
-        q = self.url_bar.text()
-        
-        # 1. Check if the input is a valid URL with scheme
-        if q.startswith('http'):
+        q = self.url_bar.text().strip()
+
+        # 1. A URL with an explicit scheme is used as typed
+        if q.lower().startswith(('http://', 'https://')):
             url = QUrl(q)
-        # 2. Check if it looks like a domain (has a dot)
-        elif '.' in q:
+        # 2. Something that looks like a domain: open it over HTTPS
+        elif _URL_RE.match(q):
             url = QUrl('https://' + q)
-        # 3. Otherwise, treat as a search query
         else:
-            # Use the configured search format (DuckDuckGo)
-            search_query = self.SEARCH_URL_TEMPLATE.format(q)
-            url = QUrl(search_query)
+            url = QUrl()
 
-        if url.isValid():
-            self.tabs.currentWidget().setUrl(url)
-        else:
-            # If the constructed URL is invalid, fall back to a basic search using the template
-            search_query = self.SEARCH_URL_TEMPLATE.format(self.url_bar.text())
-            self.tabs.currentWidget().setUrl(QUrl(search_query))
+        # 3. Otherwise (or if the address is invalid), search with the configured engine.
+        # The query is percent-encoded so spaces and '&' survive in the search URL.
+        if not url.isValid():
+            url = QUrl(self.SEARCH_URL_TEMPLATE.format(urllib.parse.quote_plus(q)))
+
+        self.tabs.currentWidget().setUrl(url)
 
+    @pyqtSlot(QUrl)
     def update_url_bar(self, url):
-        """Updates the address bar when the tab navigates."""
-        if self.tabs.currentWidget() == self.sender():
-            self.url_bar.setText(url.toString())
-            # Ensure text is visible from the start
-            self.url_bar.setCursorPosition(0)
+        """Updates the address bar when the current tab navigates (coalesced by _url_timer)."""
+        if self.tabs.currentWidget() is self.sender():
+            self._pending_url = url
+            # Not restarted while active, so a steady stream still flushes every interval
+            if not self._url_timer.isActive():
+                self._url_timer.start()
 
+    @pyqtSlot()
+    def _flush_url_bar(self):
+        """Shows the most recent URL queued by update_url_bar."""
+        if self._pending_url is not None:
+            self._show_url(self._pending_url)
+            self._pending_url = None
+
+    def _show_url(self, url):
+        """Sets the address bar text right away."""
+        self.url_bar.setText(url.toString())
+        # Ensure text is visible from the start
+        self.url_bar.setCursorPosition(0)
+
+    @pyqtSlot(int)
     def current_tab_changed(self, index):
         """Updates the URL bar and title when the active tab changes."""
         if index != -1:
             current_browser = self.tabs.widget(index)
-            self.update_url_bar(current_browser.url())
+            if not isinstance(current_browser, BrowserTab):
+                # First time this tab is shown (or it was suspended): create its web view now
+                current_browser = self.materialize_tab(index)
+
+            # Both the tab being left and the one being shown count as just used
+            now = time.monotonic()
+            if self._focused_tab in self._last_focus:
+                self._last_focus[self._focused_tab] = now
+            self._last_focus[current_browser] = now
+            self._focused_tab = current_browser
+            # Show the new tab's URL immediately, dropping any update queued by the previous tab
+            self._url_timer.stop()
+            self._pending_url = None
+            self._show_url(current_browser.url())
             self.setWindowTitle(f"{current_browser.title()} - PyChrome")
         
     def setTabText(self, title, index):
         """Updates the title of the specified tab."""
         if index != -1:
+            # titleChanged repeats during loads; skip the Qt calls if nothing changed.
+            # Keyed by widget rather than index, since indices shift as tabs close.
+            browser = self.tabs.widget(index)
+            if self._last_title.get(browser) == title:
+                return
+            self._last_title[browser] = title
+
             # Only use the first part of the title for brevity in the tab bar
-            self.tabs.setTabText(index, title.split(" - ")[0])
+            self.tabs.setTabText(index, title.partition(" - ")[0])
             
             # Only update the main window title if the tab being updated is the current one
             if index == self.tabs.currentIndex():
                 self.setWindowTitle(f"{title} - PyChrome")
 
+    @pyqtSlot()
     def navigate_home(self):
         """Navigates the current tab to the home page (DuckDuckGo)."""
         self.tabs.currentWidget().setUrl(self.DEFAULT_HOME_URL)
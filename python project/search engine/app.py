@@ -1,34 +1,87 @@
 # app.py
-from flask import Flask, request, render_template_string
+import numpy as np
+from flask import Flask, request, render_template_string, abort
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import sqlite3
+import threading
 
 app = Flask(__name__)
 
+MAX_RESULTS = 20  # Only the top hits are shown, so only those are ever sorted
+
+# One shared read-only connection per process instead of connect/close per call.
+# Journal mode can only be changed by a writer, so WAL (non-blocking reads during
+# a crawl) is left to the crawler.
+_conn = None
+_conn_lock = threading.Lock()  # sqlite3 connections must not be used by two threads at once
+
+def _connection():
+    """
+    Opens the shared connection on first use (caller holds _conn_lock), so the app
+    can start before the crawler has created search.db.
+    """
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect('file:search.db?mode=ro', uri=True, check_same_thread=False)
+        conn.execute('PRAGMA query_only=1')
+        _conn = conn
+    return _conn
+
 def get_documents():
-    conn = sqlite3.connect('search.db')
-    c = conn.cursor()
-    c.execute('SELECT url, content FROM pages')
-    rows = c.fetchall()
-    conn.close()
-    return rows
+    with _conn_lock:
+        return _connection().execute('SELECT url, content FROM pages').fetchall()
+
+# --- In-memory search index ---
+# Built once at startup (and on /reindex) instead of refitting TF-IDF on every query.
+# Held as one immutable (urls, vectorizer, tfidf) tuple, or None while empty, and
+# replaced in a single assignment so a request never mixes parts of two indexes.
+_index = None
+
+def build_index():
+    """(Re)builds the TF-IDF index over all crawled pages."""
+    global _index
+    try:
+        rows = get_documents()
+    except sqlite3.OperationalError as e:
+        # Nothing crawled yet: serve an empty index until /reindex runs
+        print(f"Search index is empty: {e}")
+        rows = []
+    if not rows:
+        _index = None
+        return
+
+    urls, contents = zip(*rows)
+    vectorizer = TfidfVectorizer()
+    # Rows come out L2-normalized, so cosine similarity is a single sparse dot product
+    tfidf = vectorizer.fit_transform(contents)
+    _index = (urls, vectorizer, tfidf)
+
+build_index()
+
+@app.route('/reindex', methods=['POST'])
+def reindex():
+    """Rebuilds the index after the crawler has run (admin only: local requests)."""
+    if request.remote_addr not in ('127.0.0.1', '::1'):
+        abort(403)
+    build_index()
+    index = _index
+    return f"Reindexed {len(index[0]) if index else 0} pages."
 
 @app.route('/', methods=['GET', 'POST'])
 def home():
     results = []
-    if request.method == 'POST':
+    index = _index  # One read, so a concurrent /reindex cannot swap it mid-query
+    if request.method == 'POST' and index is not None:
+        urls, vectorizer, tfidf = index
         query = request.form['query']
-        rows = get_documents()
-        urls = [row[0] for row in rows]
-        contents = [row[1] for row in rows]
-
-        vectorizer = TfidfVectorizer()
-        tfidf_matrix = vectorizer.fit_transform(contents)
         query_vec = vectorizer.transform([query])
-        scores = cosine_similarity(query_vec, tfidf_matrix).flatten()
-        ranked = sorted(zip(urls, scores), key=lambda x: x[1], reverse=True)
-        results = [(url, score) for url, score in ranked if score > 0]
+        scores = (tfidf @ query_vec.T).toarray().ravel()
+
+        # Select the top K in O(D) with argpartition, then sort just those K
+        k = min(MAX_RESULTS, scores.size)
+        top_idx = np.argpartition(-scores, k - 1)[:k]
+        top_idx = top_idx[np.argsort(-scores[top_idx])]
+        results = [(urls[i], float(scores[i])) for i in top_idx if scores[i] > 0]
 
     return render_template_string('''
         <h2>Mini Search Engine</h2>
@@ -1,7 +1,11 @@
 # crawler.py
 import sqlite3
 import requests
-from bs4 import BeautifulSoup
+from collections import deque
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from bs4 import BeautifulSoup, SoupStrainer
 from urllib.parse import urljoin, urlparse
 
 # --- Configuration ---
@@ -9,8 +13,24 @@ from urllib.parse import urljoin, urlparse
 START_URL = 'https://en.wikipedia.org/wiki/Search_engine'
 MAX_PAGES = 20  # Limit the crawl to 20 pages
 DB_NAME = 'search.db'
+MAX_WORKERS = 8  # Pages fetched concurrently
+COMMIT_EVERY = 50  # Pages buffered per database transaction
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36'
+}
 # ---------------------
 
+# One keep-alive session per process, shared by the worker threads: TCP/TLS connections
+# to the same host are pooled (one slot per worker) and transient failures are retried
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+_ADAPTER = HTTPAdapter(pool_maxsize=MAX_WORKERS, max_retries=Retry(total=2, backoff_factor=0.3))
+SESSION.mount('https://', _ADAPTER)
+SESSION.mount('http://', _ADAPTER)
+
+# Only Wikipedia's main content div is ever used, so only that subtree is parsed
+MAIN_CONTENT = SoupStrainer('div', id='mw-content-text')
+
 def init_db():
     """Creates the database and 'pages' table."""
     conn = sqlite3.connect(DB_NAME)
@@ -29,89 +49,114 @@ def init_db():
     conn.close()
     print(f"Database '{DB_NAME}' initialized.")
 
+def fetch_page(url, base_domain):
+    """
+    Downloads and parses one page (runs in a worker thread).
+    Returns (url, text_content, links), or None if the page is skipped.
+    """
+    try:
+        response = SESSION.get(url, timeout=5)
+        
+        # Raise an error for bad responses (4xx, 5xx)
+        response.raise_for_status()
+        
+        if 'text/html' not in response.headers.get('Content-Type', ''):
+            return None  # Skip non-HTML pages
+        
+        # Extract text (IMPROVED version)
+        # Parse only the specific div for main content on Wikipedia, with the C-based lxml parser.
+        # Passing bytes lets lxml detect the charset instead of decoding in Python first.
+        main_content = BeautifulSoup(response.content, 'lxml', parse_only=MAIN_CONTENT)
+
+        if not main_content.contents:
+            # If we can't find the main content, skip this page
+            print(f"Could not find main content for {url}, skipping.")
+            return None
+
+        # Remove navigation bars, footers, etc., that are *inside* the main content div
+        for element in main_content.find_all(['nav', 'table', '.noprint', '.mw-editsection']):
+            element.decompose() # This removes the element
+
+        # Get the cleaned text
+        text_content = ' '.join(main_content.get_text().split())
+        
+        # Find new links to visit
+        links = []
+        for link in main_content.find_all('a', href=True):
+            # Clean URL (remove fragments)
+            new_url = urljoin(url, link['href']).split('#')[0]
+            # Stay on the same domain
+            if urlparse(new_url).netloc == base_domain:
+                links.append(new_url)
+        return url, text_content, links
+
+    except requests.RequestException as e:
+        print(f"Failed to fetch {url}: {e}")
+    except Exception as e:
+        print(f"Error processing {url}: {e}")
+    return None
+
+def save_pages(conn, pending):
+    """Writes the buffered (url, content) rows in a single transaction and clears the buffer."""
+    if not pending:
+        return
+    # Duplicate URLs are skipped by the UNIQUE constraint instead of failing the batch
+    conn.executemany('INSERT OR IGNORE INTO pages (url, content) VALUES (?, ?)', pending)
+    conn.commit()
+    pending.clear()
+
 def crawl():
-    """Crawls web pages and stores their text content in the database."""
+    """
+    Crawls web pages and stores their text content in the database.
+    Pages are fetched concurrently by a thread pool sharing the keep-alive SESSION;
+    the frontier, queued set and database are only touched from this thread.
+    """
     print(f"Starting crawl from: {START_URL}")
     conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
+    # WAL lets the search app keep reading during a crawl; with WAL, synchronous=NORMAL
+    # only fsyncs at checkpoints instead of on every commit
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
     
-    pages_to_visit = [START_URL]
-    visited_pages = set()
+    # FIFO frontier with O(1) popleft; `queued` holds every URL ever queued (visited or not)
+    pages_to_visit = deque([START_URL])
+    queued = {START_URL}
     pages_crawled = 0
+    pending = []  # Crawled (url, content) rows not yet written
     
     # Get the base domain to stay on the same site
     base_domain = urlparse(START_URL).netloc
 
-    while pages_to_visit and pages_crawled < MAX_PAGES:
-        current_url = pages_to_visit.pop(0)
-        
-        if current_url in visited_pages:
-            continue
-        
-        try:
-            # Add this headers dictionary
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36'
-            }
-            
-            # Add headers=headers to the request
-            response = requests.get(current_url, headers=headers, timeout=5)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        while pages_to_visit and pages_crawled < MAX_PAGES:
+            # Take the next batch of URLs, never more than the pages still allowed
+            batch = []
+            while pages_to_visit and len(batch) < min(MAX_WORKERS, MAX_PAGES - pages_crawled):
+                batch.append(pages_to_visit.popleft())
             
-            # Raise an error for bad responses (4xx, 5xx)
-            response.raise_for_status()
+            futures = [executor.submit(fetch_page, url, base_domain) for url in batch]
             
-            if 'text/html' not in response.headers.get('Content-Type', ''):
-                continue  # Skip non-HTML pages
+            for future in as_completed(futures):
+                result = future.result()
+                if result is None:
+                    continue
+                current_url, text_content, links = result
+                pages_crawled += 1
+                pending.append((current_url, text_content))
+                print(f"[{pages_crawled}/{MAX_PAGES}] Crawled: {current_url}")
                 
-            visited_pages.add(current_url)
-            pages_crawled += 1
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract text (IMPROVED version)
-            # Find the specific div for main content on Wikipedia
-            main_content = soup.find('div', id='mw-content-text')
-
-            if main_content:
-                # Remove navigation bars, footers, etc., that are *inside* the main content div
-                for element in main_content.find_all(['nav', 'table', '.noprint', '.mw-editsection']):
-                    element.decompose() # This removes the element
-
-                # Get the cleaned text
-                text_content = ' '.join(main_content.get_text().split())
-            else:
-                # If we can't find the main content, skip this page
-                print(f"Could not find main content for {current_url}, skipping.")
-                continue # This skips the rest of the loop and goes to the next page
-            # Save to database
-            try:
-                c.execute('INSERT INTO pages (url, content) VALUES (?, ?)', (current_url, text_content))
-                conn.commit()
-                print(f"[{pages_crawled}/{MAX_PAGES}] Crawled and saved: {current_url}")
-            except sqlite3.IntegrityError:
-                print(f"URL already in database: {current_url}")
-            
-            # Find new links to visit
-            if main_content:
-                for link in main_content.find_all('a', href=True):
-                    href = link['href']
-                    new_url = urljoin(current_url, href)
-                    
-                    # Clean URL (remove fragments)
-                    new_url = new_url.split('#')[0]
-                    
-                    # Stay on the same domain and avoid visited links
-                    if urlparse(new_url).netloc == base_domain and \
-                       new_url not in visited_pages and \
-                       new_url not in pages_to_visit:
-                        
+                # Queue new links, avoiding visited or already queued ones
+                for new_url in links:
+                    if new_url not in queued:
+                        queued.add(new_url)
                         pages_to_visit.append(new_url)
+            
+            # Save buffered pages in one transaction every COMMIT_EVERY pages
+            if len(pending) >= COMMIT_EVERY:
+                save_pages(conn, pending)
 
-        except requests.RequestException as e:
-            print(f"Failed to fetch {current_url}: {e}")
-        except Exception as e:
-            print(f"Error processing {current_url}: {e}")
-
+    # Save whatever is left
+    save_pages(conn, pending)
     conn.close()
     print(f"\nCrawl complete. {pages_crawled} pages saved to '{DB_NAME}'.")
 
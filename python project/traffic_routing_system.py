@@ -1,5 +1,15 @@
 import heapq
 import math
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError: # Numba is optional; routing falls back to the NumPy/pure-Python loops
+    njit = None
+
+def _jit(func):
+    """Compiles a kernel with Numba when it is installed, otherwise leaves it as plain Python."""
+    return njit(cache=True)(func) if njit is not None else func
 
 class TrafficGraph:
     """
@@ -19,6 +29,23 @@ class TrafficGraph:
         # Adjacency list: node -> {neighbor: weight}
         self.graph = {node: {} for node in nodes}
 
+        # Stable integer index per node, shared by the coordinate and CSR arrays
+        self._idx_to_node = sorted(self.graph)
+        self._node_to_idx = {node: i for i, node in enumerate(self._idx_to_node)}
+
+        # Coordinates as flat arrays by node index; NaN marks a node without coordinates
+        missing = (np.nan, np.nan)
+        n = len(self._idx_to_node)
+        self._coord_x = np.fromiter(
+            (coordinates.get(node, missing)[0] for node in self._idx_to_node), dtype=np.float64, count=n
+        )
+        self._coord_y = np.fromiter(
+            (coordinates.get(node, missing)[1] for node in self._idx_to_node), dtype=np.float64, count=n
+        )
+
+        # CSR arrays mirroring self.graph for the pathfinding loops (built by to_csr)
+        self._csr_stale = True
+
         # Build initial graph
         for u, v, weight in edges:
             self.add_edge(u, v, weight)
@@ -28,25 +55,83 @@ class TrafficGraph:
     def add_edge(self, u, v, weight):
         """Adds or updates a directed edge in the graph."""
         if u in self.graph and v in self.graph:
+            if not self._csr_stale and v in self.graph[u]:
+                # Existing road: update the CSR weights in place
+                pos = self._edge_pos[(u, v)]
+                self._weights[pos] = weight
+                self._rweights[self._reverse_pos[pos]] = weight
+            else:
+                # New road: the CSR layout changes, rebuild it on next use
+                self._csr_stale = True
             self.graph[u][v] = weight
         else:
             print(f"Warning: Node {u} or {v} not found.")
 
+    def to_csr(self):
+        """
+        Builds a CSR (compressed sparse row) copy of the adjacency list: the neighbors
+        of node index i are _indices[_indptr[i]:_indptr[i+1]], with the matching road
+        weights in _weights. Returns (indptr, indices, weights).
+        """
+        # Position of each directed edge in the arrays, for O(1) weight updates
+        self._edge_pos = {}
+
+        indptr = [0]
+        indices = []
+        weights = []
+        for u in self._idx_to_node:
+            for v, weight in self.graph[u].items():
+                self._edge_pos[(u, v)] = len(indices)
+                indices.append(self._node_to_idx[v])
+                weights.append(weight)
+            indptr.append(len(indices))
+
+        self._indptr = np.array(indptr, dtype=np.int64)
+        self._indices = np.array(indices, dtype=np.int64)
+        self._weights = np.array(weights, dtype=np.float64)
+
+        # Reverse CSR (incoming roads per node) for backward searches: edges regrouped by target
+        order = np.argsort(self._indices, kind='stable')
+        counts = np.bincount(self._indices, minlength=len(self._idx_to_node))
+        self._rindptr = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        self._rindices = np.repeat(np.arange(len(self._idx_to_node), dtype=np.int64), np.diff(self._indptr))[order]
+        self._rweights = self._weights[order]
+        # Forward edge position -> reverse edge position
+        self._reverse_pos = np.empty_like(order)
+        self._reverse_pos[order] = np.arange(len(order))
+
+        self._csr_stale = False
+        return self._indptr, self._indices, self._weights
+
+    def csr(self):
+        """Returns the CSR arrays, (re)building them only if the road layout changed."""
+        if self._csr_stale:
+            return self.to_csr()
+        return self._indptr, self._indices, self._weights
+
+    def reverse_csr(self):
+        """Returns the reverse CSR arrays (rindptr, rindices, rweights) of incoming roads."""
+        self.csr()
+        return self._rindptr, self._rindices, self._rweights
+
     def update_traffic(self, u, v, new_weight, direction='both'):
         """Simulates dynamic traffic by updating the weight (cost) of a road."""
         print(f"\n[DYNAMIC UPDATE]: Road {u} <-> {v} traffic increased! Weight changed to {new_weight}")
         
         # Update u -> v
         if v in self.graph.get(u, {}):
-            self.graph[u][v] = new_weight
+            self.add_edge(u, v, new_weight)
         
         # Update v -> u if bidirectional
         if direction == 'both':
             if u in self.graph.get(v, {}):
-                self.graph[v][u] = new_weight
+                self.add_edge(v, u, new_weight)
 
     def get_neighbors(self, node):
-        """Returns a list of neighbors and their weights for a given node."""
+        """
+        Returns a list of neighbors and their weights for a given node.
+        Kept as public API; the routing functions read the CSR arrays instead.
+        """
         return self.graph.get(node, {}).items()
 
     def heuristic(self, node, goal):
@@ -54,31 +139,211 @@ class TrafficGraph:
         Calculates the heuristic (straight-line/Euclidean distance) between two nodes.
         This represents the minimum possible travel time, used by the A* algorithm.
         """
-        if node not in self.coordinates or goal not in self.coordinates:
+        if node not in self._node_to_idx or goal not in self._node_to_idx:
             return 0  # Should not happen in a defined graph
-        
-        x1, y1 = self.coordinates[node]
-        x2, y2 = self.coordinates[goal]
-        return math.hypot(x2 - x1, y2 - y1)
 
-def reconstruct_path(parents, current):
-    """Utility function to reconstruct the path from the parent dictionary."""
+        i, j = self._node_to_idx[node], self._node_to_idx[goal]
+        dx = self._coord_x[j] - self._coord_x[i]
+        dy = self._coord_y[j] - self._coord_y[i]
+        distance = (dx * dx + dy * dy) ** 0.5
+        return 0 if math.isnan(distance) else distance
+
+    def heuristics_to(self, goal):
+        """Returns the heuristic from every node to `goal` as one array indexed by node index."""
+        j = self._node_to_idx[goal]
+        h = np.hypot(self._coord_x - self._coord_x[j], self._coord_y - self._coord_y[j])
+        h[np.isnan(h)] = 0.0  # Nodes without coordinates
+        return h
+
+def reconstruct_path(parents, current, idx_to_node):
+    """Utility function to reconstruct the path by walking the parent array until -1, mapping indices back to nodes."""
     path = []
-    while current is not None:
-        path.append(current)
-        current = parents.get(current)
+    while current != -1:
+        path.append(idx_to_node[current])
+        current = parents[current]
     return path[::-1]
 
+# --- Compiled CSR Kernels ---
+# The heap is a pair of preallocated arrays (keys, node indices) ordered like heapq's
+# (f, node) tuples, so ties break on the lower node index exactly as before.
+
+@_jit
+def _heap_less(key_a, val_a, key_b, val_b):
+    return key_a < key_b or (key_a == key_b and val_a < val_b)
+
+@_jit
+def _heap_push(keys, vals, size, key, val):
+    """Pushes (key, val) onto a heap holding `size` items; returns the (possibly grown) arrays."""
+    if size == keys.shape[0]:
+        grown_keys = np.empty(2 * size, dtype=keys.dtype)
+        grown_vals = np.empty(2 * size, dtype=vals.dtype)
+        grown_keys[:size] = keys
+        grown_vals[:size] = vals
+        keys, vals = grown_keys, grown_vals
+
+    i = size
+    keys[i] = key
+    vals[i] = val
+    # Sift up
+    while i > 0:
+        parent = (i - 1) // 2
+        if not _heap_less(keys[i], vals[i], keys[parent], vals[parent]):
+            break
+        keys[i], keys[parent] = keys[parent], keys[i]
+        vals[i], vals[parent] = vals[parent], vals[i]
+        i = parent
+    return keys, vals
+
+@_jit
+def _heap_pop(keys, vals, size):
+    """Removes and returns the smallest (key, val) from a heap holding `size` items."""
+    key, val = keys[0], vals[0]
+    size -= 1
+    keys[0] = keys[size]
+    vals[0] = vals[size]
+    # Sift down
+    i = 0
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            break
+        if child + 1 < size and _heap_less(keys[child + 1], vals[child + 1], keys[child], vals[child]):
+            child += 1
+        if not _heap_less(keys[child], vals[child], keys[i], vals[i]):
+            break
+        keys[i], keys[child] = keys[child], keys[i]
+        vals[i], vals[child] = vals[child], vals[i]
+        i = child
+    return key, val
+
+@_jit
+def _index_path(parents, end):
+    """Walks the parent array back from `end` and returns the node indices start -> end."""
+    length = 0
+    current = end
+    while current != -1:
+        length += 1
+        current = parents[current]
+    path = np.empty(length, dtype=np.int64)
+    current = end
+    for i in range(length - 1, -1, -1):
+        path[i] = current
+        current = parents[current]
+    return path
+
+@_jit
+def _dijkstra_csr(indptr, indices, weights, start, end, n):
+    """Dijkstra over CSR arrays. Returns (path of node indices, cost); an empty path if unreachable."""
+    distances = np.full(n, np.inf)
+    distances[start] = 0.0
+    parents = np.full(n, -1, dtype=np.int64)
+    closed = np.zeros(n, dtype=np.bool_)
+
+    keys = np.empty(max(n, 1), dtype=np.float64)
+    vals = np.empty(max(n, 1), dtype=np.int64)
+    keys, vals = _heap_push(keys, vals, 0, 0.0, start)
+    size = 1
+
+    while size > 0:
+        current_distance, current_node = _heap_pop(keys, vals, size)
+        size -= 1
+
+        # Lazy deletion: skip stale entries of already settled nodes
+        if closed[current_node]:
+            continue
+        closed[current_node] = True
+
+        if current_node == end:
+            return _index_path(parents, end), distances[end]
+
+        for k in range(indptr[current_node], indptr[current_node + 1]):
+            neighbor = indices[k]
+            distance = current_distance + weights[k]
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                parents[neighbor] = current_node
+                keys, vals = _heap_push(keys, vals, size, distance, neighbor)
+                size += 1
+
+    return np.empty(0, dtype=np.int64), np.inf
+
+@_jit
+def _a_star_csr(indptr, indices, weights, h, start, end, n):
+    """A* over CSR arrays with heuristics `h` precomputed per node. Returns (path of node indices, cost); an empty path if unreachable."""
+    g_score = np.full(n, np.inf)
+    g_score[start] = 0.0
+    parents = np.full(n, -1, dtype=np.int64)
+
+    keys = np.empty(max(n, 1), dtype=np.float64)
+    vals = np.empty(max(n, 1), dtype=np.int64)
+    keys, vals = _heap_push(keys, vals, 0, h[start], start)
+    size = 1
+
+    while size > 0:
+        current_f, current_node = _heap_pop(keys, vals, size)
+        size -= 1
+
+        # Lazy deletion: skip entries superseded by a cheaper path to the node.
+        # Nodes may still be reopened, since the coordinate heuristic is not consistent.
+        if current_f > g_score[current_node] + h[current_node]:
+            continue
+
+        if current_node == end:
+            return _index_path(parents, end), g_score[end]
+
+        for k in range(indptr[current_node], indptr[current_node + 1]):
+            neighbor = indices[k]
+            tentative_g_score = g_score[current_node] + weights[k]
+            if tentative_g_score < g_score[neighbor]:
+                parents[neighbor] = current_node
+                g_score[neighbor] = tentative_g_score
+                f_score = tentative_g_score + h[neighbor]
+                keys, vals = _heap_push(keys, vals, size, f_score, neighbor)
+                size += 1
+
+    return np.empty(0, dtype=np.int64), np.inf
+
+# --- Routing Algorithms ---
+
+def _labels(graph, index_path):
+    """Maps a kernel's node-index path back to node labels (None when no path exists)."""
+    if len(index_path) == 0:
+        return None
+    return [graph._idx_to_node[i] for i in index_path]
+
 def dijkstra(graph, start_node, end_node):
     """
     Dijkstra's Algorithm: Finds the shortest path based purely on accumulated travel cost.
     Uses a priority queue (min-heap) to efficiently select the node with the smallest known distance.
+    Runs the compiled CSR kernel when Numba is available.
     """
-    # Priority Queue stores (distance, node)
-    priority_queue = [(0, start_node)]
-    distances = {node: float('inf') for node in graph.nodes}
-    distances[start_node] = 0
-    parents = {node: None for node in graph.nodes}
+    if start_node not in graph._node_to_idx or end_node not in graph._node_to_idx:
+        return None, float('inf') # Unknown node: no path
+    if njit is None:
+        return _dijkstra_numpy(graph, start_node, end_node)
+
+    indptr, indices, weights = graph.csr()
+
+    path, cost = _dijkstra_csr(
+        indptr, indices, weights,
+        graph._node_to_idx[start_node], graph._node_to_idx[end_node], len(indptr) - 1,
+    )
+    return _labels(graph, path), float(cost)
+
+def _dijkstra_numpy(graph, start_node, end_node):
+    """
+    Fallback Dijkstra without Numba: runs on the graph's CSR arrays, relaxing all
+    neighbors of a node with NumPy array operations.
+    """
+    indptr, indices, weights = graph.csr()
+    start = graph._node_to_idx[start_node]
+    end = graph._node_to_idx[end_node]
+
+    # Priority Queue stores (distance, node index)
+    priority_queue = [(0.0, start)]
+    distances = np.full(len(indptr) - 1, np.inf)
+    distances[start] = 0
+    parents = np.full(len(indptr) - 1, -1, dtype=np.int64)
 
     while priority_queue:
         current_distance, current_node = heapq.heappop(priority_queue)
@@ -88,17 +353,22 @@ def dijkstra(graph, start_node, end_node):
             continue
         
         # Goal check
-        if current_node == end_node:
-            return reconstruct_path(parents, end_node), distances[end_node]
+        if current_node == end:
+            return reconstruct_path(parents, end, graph._idx_to_node), float(distances[end])
 
-        for neighbor, weight in graph.get_neighbors(current_node):
-            distance = current_distance + weight
-            
-            # If a shorter path to the neighbor is found
-            if distance < distances[neighbor]:
-                distances[neighbor] = distance
-                parents[neighbor] = current_node
-                heapq.heappush(priority_queue, (distance, neighbor))
+        # Relax every outgoing road at once
+        lo, hi = indptr[current_node], indptr[current_node + 1]
+        neighbors = indices[lo:hi]
+        new_distances = current_distance + weights[lo:hi]
+        
+        # Keep only neighbors for which a shorter path was found
+        shorter = new_distances < distances[neighbors]
+        neighbors = neighbors[shorter]
+        new_distances = new_distances[shorter]
+        distances[neighbors] = new_distances
+        parents[neighbors] = current_node
+        for neighbor, distance in zip(neighbors.tolist(), new_distances.tolist()):
+            heapq.heappush(priority_queue, (distance, neighbor))
 
     return None, float('inf') # Path not found
 
@@ -106,27 +376,53 @@ def a_star(graph, start_node, end_node):
     """
     A* Search Algorithm: Finds the optimal path by combining accumulated cost (g_score)
     and a heuristic estimate (h_score) to the goal. f_score = g_score + h_score.
+    Runs the compiled CSR kernel when Numba is available.
     """
+    if start_node not in graph._node_to_idx or end_node not in graph._node_to_idx:
+        return None, float('inf') # Unknown node: no path
+    if njit is None:
+        return _a_star_python(graph, start_node, end_node)
+
+    indptr, indices, weights = graph.csr()
+
+    path, cost = _a_star_csr(
+        indptr, indices, weights, graph.heuristics_to(end_node),
+        graph._node_to_idx[start_node], graph._node_to_idx[end_node], len(indptr) - 1,
+    )
+    return _labels(graph, path), float(cost)
+
+def _a_star_python(graph, start_node, end_node):
+    """Fallback A* without Numba, on the CSR arrays with per-node state kept in arrays."""
+    indptr, indices, weights = graph.csr()
+    start = graph._node_to_idx[start_node]
+    end = graph._node_to_idx[end_node]
+    n = len(indptr) - 1
+
+    # Heuristic to the goal for every node, computed once
+    h = graph.heuristics_to(end_node)
+
     # g_score: cost from start node to current node
-    g_score = {node: float('inf') for node in graph.nodes}
-    g_score[start_node] = 0
-    
-    # f_score: g_score + heuristic (estimated total cost)
-    f_score = {node: float('inf') for node in graph.nodes}
-    f_score[start_node] = graph.heuristic(start_node, end_node)
+    g_score = np.full(n, np.inf)
+    g_score[start] = 0
+    parents = np.full(n, -1, dtype=np.int64)
 
-    # Priority Queue stores (f_score, node)
-    priority_queue = [(f_score[start_node], start_node)]
-    parents = {node: None for node in graph.nodes}
+    # Priority Queue stores (f_score, node index)
+    priority_queue = [(float(h[start]), start)]
 
     while priority_queue:
         current_f, current_node = heapq.heappop(priority_queue)
 
+        # Lazy deletion: skip entries superseded by a cheaper path to the node.
+        # Nodes may still be reopened, since the coordinate heuristic is not consistent.
+        if current_f > g_score[current_node] + h[current_node]:
+            continue
+
         # Goal check
-        if current_node == end_node:
-            return reconstruct_path(parents, end_node), g_score[end_node]
+        if current_node == end:
+            return reconstruct_path(parents, end, graph._idx_to_node), float(g_score[end])
 
-        for neighbor, weight in graph.get_neighbors(current_node):
+        lo, hi = indptr[current_node], indptr[current_node + 1]
+        for neighbor, weight in zip(indices[lo:hi].tolist(), weights[lo:hi].tolist()):
             # Tentative g_score is the cost of the path from start to neighbor through current_node
             tentative_g_score = g_score[current_node] + weight
 
@@ -135,14 +431,86 @@ def a_star(graph, start_node, end_node):
                 parents[neighbor] = current_node
                 g_score[neighbor] = tentative_g_score
                 
-                # Update f_score using the heuristic
-                f_score[neighbor] = tentative_g_score + graph.heuristic(neighbor, end_node)
-                
-                # Add/Update the neighbor in the priority queue
-                heapq.heappush(priority_queue, (f_score[neighbor], neighbor))
+                # Add/Update the neighbor in the priority queue, f_score = g_score + heuristic
+                heapq.heappush(priority_queue, (float(tentative_g_score + h[neighbor]), neighbor))
 
     return None, float('inf') # Path not found
 
+def bidirectional_a_star(graph, start_node, end_node):
+    """
+    Bidirectional A*: Searches forward from the start and backward from the goal at the same
+    time, always expanding the side with the smaller top key, until the two frontiers prove
+    the best meeting point. Both sides use the average potential (h_end - h_start) / 2 so
+    their keys are comparable and the search can stop once top_f + top_b >= mu.
+    """
+    if start_node not in graph._node_to_idx or end_node not in graph._node_to_idx:
+        return None, float('inf') # Unknown node: no path
+    if start_node == end_node:
+        return [start_node], 0
+
+    # Index 0 is the forward search over the CSR rows (from start),
+    # index 1 the backward search over the reverse CSR (from end)
+    csr = (graph.csr(), graph.reverse_csr())
+    start = graph._node_to_idx[start_node]
+    end = graph._node_to_idx[end_node]
+    n = len(graph._idx_to_node)
+
+    # Potential of every node, from the heuristics towards both ends
+    potential = (graph.heuristics_to(end_node) - graph.heuristics_to(start_node)) / 2
+    sign = (1, -1)
+
+    g_score = np.full((2, n), np.inf)
+    g_score[0, start] = 0
+    g_score[1, end] = 0
+    parents = np.full((2, n), -1, dtype=np.int64)
+    closed = np.zeros((2, n), dtype=bool)
+    priority_queues = ([(float(potential[start]), start)], [(float(-potential[end]), end)])
+
+    # mu: cost of the best start -> end path seen so far, through meeting_node
+    mu = float('inf')
+    meeting_node = -1
+
+    while priority_queues[0] and priority_queues[1]:
+        top_f, top_b = priority_queues[0][0][0], priority_queues[1][0][0]
+        if top_f + top_b >= mu:
+            break
+
+        side = 0 if top_f <= top_b else 1
+        other = 1 - side
+        _, current_node = heapq.heappop(priority_queues[side])
+
+        # Lazy deletion: skip stale entries of already expanded nodes
+        if closed[side, current_node]:
+            continue
+        closed[side, current_node] = True
+
+        indptr, indices, weights = csr[side]
+        lo, hi = indptr[current_node], indptr[current_node + 1]
+        for neighbor, weight in zip(indices[lo:hi].tolist(), weights[lo:hi].tolist()):
+            tentative_g_score = g_score[side, current_node] + weight
+            if not closed[side, neighbor] and tentative_g_score < g_score[side, neighbor]:
+                parents[side, neighbor] = current_node
+                g_score[side, neighbor] = tentative_g_score
+                key = tentative_g_score + sign[side] * potential[neighbor]
+                heapq.heappush(priority_queues[side], (float(key), neighbor))
+
+            # The other search already reached this node: the frontiers touch here
+            total = g_score[side, neighbor] + g_score[other, neighbor]
+            if total < mu:
+                mu = float(total)
+                meeting_node = neighbor
+
+    if meeting_node == -1:
+        return None, float('inf') # Path not found
+
+    # Splice the forward path to the meeting node with the backward path to the goal
+    path = reconstruct_path(parents[0], meeting_node, graph._idx_to_node)
+    current = parents[1, meeting_node]
+    while current != -1:
+        path.append(graph._idx_to_node[current])
+        current = parents[1, current]
+    return path, mu
+
 # --- SIMULATION AND DEMONSTRATION ---
 
 def run_simulation(city_graph, start, end):
@@ -157,6 +525,10 @@ def run_simulation(city_graph, start, end):
     a_star_path, a_star_cost = a_star(city_graph, start, end)
     print(f"A* Search (Optimal Route): Path = {' -> '.join(a_star_path) if a_star_path else 'N/A'}, Cost = {a_star_cost:.2f}")
 
+    # 3. Bidirectional A* Search
+    bi_path, bi_cost = bidirectional_a_star(city_graph, start, end)
+    print(f"Bidirectional A* Search: Path = {' -> '.join(bi_path) if bi_path else 'N/A'}, Cost = {bi_cost:.2f}")
+
 if __name__ == "__main__":
     # System Design: Define City Network
     